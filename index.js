@@ -305,7 +305,11 @@ function runPythonDownloader(query, type = 'book', requestId) {
         console.log(`🐍 [${requestId}] Running Python for "${query}" (${type})`);
         const startTime = Date.now();
         
-        const py = spawn('python', ['Downloader.py', query, '--type', type], { 
+        const args = ['Downloader.py', query, '--type', type];
+        // Covers are opt-in on the Python side; books still get one sent after the PDF
+        if (type === 'book') args.push('--with-cover');
+
+        const py = spawn('python', args, { 
             cwd: __dirname,
             // Set timeout and memory limits to prevent runaway processes
             timeout: 20 * 60 * 1000  
@@ -0,0 +1 @@
+from pdf_downloader.core import *